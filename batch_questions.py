@@ -0,0 +1,90 @@
+# batch_questions.py
+# Command line client for the /batch endpoint of langchain_chat_api.py
+import os
+import sys
+import csv
+import json
+import argparse
+import requests
+
+API_URL = "http://localhost:8001"
+QUESTION_COLUMNS = ["question", "pregunta"]
+COMPARISON_TEMPLATE = "¿Cuáles son las tarifas y comisiones de {product} en {bank}?"
+
+def load_questions(path):
+    """Read questions from a CSV (``question``/``pregunta`` column or first column) or a text file, one per line."""
+    stream = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8', newline='')
+    with stream:
+        if os.path.splitext(path)[1].lower() != '.csv':
+            return [line.strip() for line in stream if line.strip()]
+        rows = list(csv.reader(stream))
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next((header.index(name) for name in QUESTION_COLUMNS if name in header), None)
+    if column is None:
+        # No recognised header: every row is a question in the first column
+        column, data = 0, rows
+    else:
+        data = rows[1:]
+    return [row[column].strip() for row in data if len(row) > column and row[column].strip()]
+
+def comparison_questions(banks, products):
+    """Expand a bank-by-product comparison into one question per pair."""
+    return [COMPARISON_TEMPLATE.format(product=product, bank=bank)
+            for product in products for bank in banks]
+
+def split_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def run_batch(questions, api_url=API_URL, max_concurrency=4, output=sys.stdout):
+    """Post the questions to /batch and copy each NDJSON result line to ``output`` as it arrives."""
+    response = requests.post(
+        f"{api_url}/batch",
+        json={"questions": questions, "max_concurrency": max_concurrency},
+        stream=True
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Error from agent API: {response.status_code} {response.text}")
+    failed = 0
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            continue
+        if "error" in json.loads(line):
+            failed += 1
+        output.write(line + "\n")
+        output.flush()
+    return failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer many banking questions in one job (NDJSON output).")
+    parser.add_argument("input", nargs="?", help="CSV or text file with questions ('-' for stdin)")
+    parser.add_argument("-q", "--question", action="append", default=[], help="Question to ask (repeatable)")
+    parser.add_argument("--banks", help="Comma separated banks for a bank-by-product comparison")
+    parser.add_argument("--products", help="Comma separated products for a bank-by-product comparison")
+    parser.add_argument("--api-url", default=API_URL, help=f"Agent API url (default: {API_URL})")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Parallel generations on the server (1-16)")
+    parser.add_argument("-o", "--output", help="Write NDJSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    questions = list(args.question)
+    if args.input:
+        questions.extend(load_questions(args.input))
+    if args.banks or args.products:
+        if not (args.banks and args.products):
+            parser.error("--banks and --products must be used together")
+        questions.extend(comparison_questions(split_list(args.banks), split_list(args.products)))
+    if not questions:
+        parser.error("no questions given")
+
+    print(f"Sending {len(questions)} questions to {args.api_url}/batch", file=sys.stderr)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        failed = run_batch(questions, args.api_url, args.max_concurrency, output)
+    except Exception as e:
+        print(f"*** Batch failed: {e} ***", file=sys.stderr)
+        exit(1)
+    finally:
+        if args.output:
+            output.close()
+    print(f"Batch finished: {len(questions)} questions, {failed} errors", file=sys.stderr)
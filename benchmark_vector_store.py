@@ -0,0 +1,156 @@
+# benchmark_vector_store.py
+# Compare Chroma and the compact memory-mapped store: open time, top-k latency, memory and overlap.
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+CHROMA_DIRECTORY = "./data/vector_store"
+COMPACT_DIRECTORY = "./data/compact_store"
+
+def rss_mb():
+    """Resident set size of this process in MB (Linux), falling back to peak RSS."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def embed_questions(path):
+    """Embed real questions (CSV or one per line, as batch_questions.py reads them); needs Ollama."""
+    from batch_questions import load_questions
+    from langchain_ollama import OllamaEmbeddings
+    embeddings = OllamaEmbeddings(model="nomic-embed-text:latest")
+    return embeddings.embed_documents(load_questions(path))
+
+def perturbed_queries(chroma_directory, count, noise, seed=0):
+    """Stored chunk embeddings plus Gaussian noise, so a query is not simply its own nearest chunk."""
+    import numpy as np
+    from langchain_community.vectorstores import Chroma
+    vectors = Chroma(persist_directory=chroma_directory).get(include=["embeddings"])["embeddings"]
+    if len(vectors) == 0:
+        return []
+    vectors = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), size=count, replace=count > len(vectors))]
+    # Noise per component scaled to each vector's RMS so `noise` is a relative magnitude
+    rms = np.sqrt((picked ** 2).mean(axis=1, keepdims=True))
+    return (picked + rng.normal(size=picked.shape).astype(np.float32) * noise * rms).tolist()
+
+def build_synthetic_stores(directory, count, dim, dtype, seed=1):
+    """Write a Chroma store and its compact export with ``count`` clustered unit vectors and fee-sized texts."""
+    import numpy as np
+    import chromadb
+    from langchain_community.vectorstores import Chroma
+    from compact_vector_store import CompactVectorStore
+    rng = np.random.default_rng(seed)
+    # Chunks of one document sit close together, like pages of a fee schedule
+    centers = rng.normal(size=(max(1, count // 50), dim))
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.6 * rng.normal(size=(count, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [f"Chunk {i}: comisión por uso de cajero automático " + "x" * 450 for i in range(count)]
+    metadatas = [{"source": f"doc{i % 40}.pdf", "page": i % 12} for i in range(count)]
+
+    chroma_directory = os.path.join(directory, "chroma")
+    compact_directory = os.path.join(directory, "compact")
+    # "langchain" is the collection the LangChain Chroma wrapper opens by default
+    collection = chromadb.PersistentClient(path=chroma_directory).get_or_create_collection("langchain")
+    for begin in range(0, count, 1000):
+        end = begin + 1000
+        collection.add(ids=[str(i) for i in range(begin, min(end, count))],
+                       embeddings=vectors[begin:end].tolist(),
+                       documents=texts[begin:end], metadatas=metadatas[begin:end])
+    CompactVectorStore.from_chroma(Chroma(persist_directory=chroma_directory), compact_directory, dtype=dtype)
+    return chroma_directory, compact_directory
+
+def run_backend(backend, directory, queries, k):
+    """Runs in a fresh process so memory numbers are not shared between backends."""
+    baseline = rss_mb()
+    start = time.perf_counter()
+    if backend == "chroma":
+        from langchain_community.vectorstores import Chroma
+        store = Chroma(persist_directory=directory)
+    else:
+        from compact_vector_store import CompactVectorStore
+        store = CompactVectorStore(directory, None)
+    open_seconds = time.perf_counter() - start
+
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        docs = store.similarity_search_by_vector_with_relevance_scores(embedding=query, k=k)
+        latencies.append(time.perf_counter() - start)
+        results.append([doc.page_content for doc, _ in docs])
+    return {
+        "open_ms": open_seconds * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "rss_mb": rss_mb() - baseline,
+        "results": results
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Chroma against the compact vector store.")
+    parser.add_argument("--chroma-dir", default=CHROMA_DIRECTORY, help=f"Chroma store (default: {CHROMA_DIRECTORY})")
+    parser.add_argument("--compact-dir", default=COMPACT_DIRECTORY, help=f"Compact store (default: {COMPACT_DIRECTORY})")
+    parser.add_argument("--questions", help="CSV or text file of real questions to embed with Ollama")
+    parser.add_argument("--queries", type=int, default=200, help="Number of perturbed query vectors without --questions")
+    parser.add_argument("--noise", type=float, default=0.5, help="Relative noise added to perturbed queries")
+    parser.add_argument("-k", type=int, default=10, help="Top-k per query")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="Benchmark throwaway stores of N synthetic chunks instead of --chroma-dir/--compact-dir")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding size for --synthetic (nomic-embed-text: 768)")
+    parser.add_argument("--int8", action="store_true", help="Quantize the --synthetic compact store to int8")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        synthetic_directory = tempfile.TemporaryDirectory()
+        args.chroma_dir, args.compact_dir = build_synthetic_stores(
+            synthetic_directory.name, args.synthetic, args.dim, "int8" if args.int8 else "float32"
+        )
+
+    for directory in (args.chroma_dir, args.compact_dir):
+        if not os.path.exists(directory):
+            print(f"*** Vector store path not found: {directory} ***")
+            exit(1)
+
+    if args.questions:
+        queries, source = embed_questions(args.questions), f"questions from {args.questions}"
+    else:
+        queries = perturbed_queries(args.chroma_dir, args.queries, args.noise)
+        source = f"stored chunks with {args.noise:.0%} noise"
+    if args.synthetic:
+        source += f"; synthetic store of {args.synthetic} x {args.dim}, {'int8' if args.int8 else 'float32'}"
+    if not queries:
+        print("*** No queries: the Chroma store is empty or the questions file has no questions ***")
+        exit(1)
+
+    report = {}
+    # "spawn": a forked child deadlocks on the Chroma client the parent opened for the queries
+    context = multiprocessing.get_context("spawn")
+    for backend, directory in (("chroma", args.chroma_dir), ("compact", args.compact_dir)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            report[backend] = executor.submit(run_backend, backend, directory, queries, args.k).result()
+
+    # Chroma's HNSW index is approximate; the compact store is exact. Multiset intersection,
+    # because re-running docs_scraper.py leaves duplicate chunk texts in the store
+    overlaps = [sum((Counter(a) & Counter(b)).values()) / max(1, len(a))
+                for a, b in zip(report["chroma"]["results"], report["compact"]["results"])]
+    print(f"{len(queries)} queries ({source}), k={args.k}")
+    print(f"{'backend':<10}{'open ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB':>10}")
+    for backend, stats in report.items():
+        print(f"{backend:<10}{stats['open_ms']:>10.1f}{stats['p50_ms']:>10.2f}"
+              f"{stats['p95_ms']:>10.2f}{stats['rss_mb']:>10.1f}")
+    print(f"top-{args.k} overlap with Chroma: {sum(overlaps) / max(1, len(overlaps)):.1%}")
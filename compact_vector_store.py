@@ -0,0 +1,198 @@
+# compact_vector_store.py
+# Read-only vector store backed by memory-mapped NumPy arrays with exact (brute-force) search.
+#
+# Directory layout written by CompactVectorStore.save():
+#   manifest.json    count, dimension, dtype and file format version
+#   embeddings.npy   (count, dim) float32, or int8 when quantized
+#   scales.npy       (count,) float32 per-row scale, only for int8
+#   sq_norms.npy     (count,) float32 squared L2 norm of each original vector
+#   texts.bin        UTF-8 chunk texts concatenated, sliced by text_offsets.npy
+#   metadata.bin     UTF-8 JSON metadata concatenated, sliced by metadata_offsets.npy
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+FORMAT_VERSION = 1
+DTYPES = ("float32", "int8")
+# Rows cast to float32 at a time during search, so int8 stores never hold a float copy of the matrix
+SEARCH_BLOCK_ROWS = 4096
+
+def pack_strings(strings):
+    """Concatenate strings as UTF-8 into one byte blob plus an int64 offsets array (len + 1)."""
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    return b"".join(encoded), offsets
+
+def quantize_int8(vectors):
+    """Symmetric per-row int8 quantization: vectors ~= codes * scales[:, None]."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+class CompactVectorStore(VectorStore):
+    """Exact top-k search over a memory-mapped embedding matrix.
+
+    Scores are squared L2 distances, the same metric Chroma uses by default, so the
+    "similarity_score_threshold" retriever keeps the threshold it has with Chroma.
+    """
+
+    def __init__(self, persist_directory, embedding_function):
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function
+        with open(os.path.join(persist_directory, "manifest.json"), 'r', encoding='utf-8') as file:
+            self.manifest = json.load(file)
+        if self.manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact store version: {self.manifest.get('version')}")
+
+        def path(name):
+            return os.path.join(persist_directory, name)
+
+        self.vectors = np.load(path("embeddings.npy"), mmap_mode="r")
+        self.sq_norms = np.load(path("sq_norms.npy"), mmap_mode="r")
+        self.scales = np.load(path("scales.npy"), mmap_mode="r") if self.manifest["dtype"] == "int8" else None
+        self.text_offsets = np.load(path("text_offsets.npy"), mmap_mode="r")
+        self.metadata_offsets = np.load(path("metadata_offsets.npy"), mmap_mode="r")
+        self.texts = np.memmap(path("texts.bin"), dtype=np.uint8, mode="r") if self.text_offsets[-1] else b""
+        self.metadata = np.memmap(path("metadata.bin"), dtype=np.uint8, mode="r") if self.metadata_offsets[-1] else b""
+
+    def __len__(self):
+        return int(self.manifest["count"])
+
+    @property
+    def embeddings(self):
+        return self.embedding_function
+
+    @staticmethod
+    def save(persist_directory, vectors, texts, metadatas=None, dtype="float32"):
+        """Write vectors, texts and metadata in the compact layout, replacing any existing store.
+
+        Files are written to a temporary sibling directory that is then renamed into place, so
+        a process that has the old store memory-mapped keeps reading consistent files and a
+        failed export leaves the old store untouched.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype}")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            # An empty export is a valid (empty) store rather than a shape error
+            vectors = vectors.reshape(0, vectors.shape[-1] if vectors.ndim == 2 else 0)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError("vectors must be a (len(texts), dim) matrix")
+        metadatas = metadatas or [{} for _ in texts]
+
+        persist_directory = os.path.abspath(persist_directory)
+        parent, name = os.path.split(persist_directory)
+        os.makedirs(parent, exist_ok=True)
+        staging_directory = tempfile.mkdtemp(prefix=f".{name}.", dir=parent)
+        # mkdtemp creates 0700; the store should be readable like any other data directory
+        os.chmod(staging_directory, 0o755)
+
+        def path(name):
+            return os.path.join(staging_directory, name)
+
+        try:
+            if dtype == "int8":
+                codes, scales = quantize_int8(vectors)
+                np.save(path("embeddings.npy"), codes)
+                np.save(path("scales.npy"), scales)
+            else:
+                np.save(path("embeddings.npy"), vectors)
+            np.save(path("sq_norms.npy"), np.einsum("ij,ij->i", vectors, vectors))
+
+            tables = (
+                ("texts.bin", "text_offsets.npy", texts),
+                ("metadata.bin", "metadata_offsets.npy",
+                 [json.dumps(meta or {}, ensure_ascii=False) for meta in metadatas])
+            )
+            for blob_name, offsets_name, values in tables:
+                blob, offsets = pack_strings(values)
+                with open(path(blob_name), 'wb') as file:
+                    file.write(blob)
+                np.save(path(offsets_name), offsets)
+
+            with open(path("manifest.json"), 'w', encoding='utf-8') as file:
+                json.dump({
+                    "version": FORMAT_VERSION,
+                    "count": len(texts),
+                    "dimension": int(vectors.shape[1]),
+                    "dtype": dtype
+                }, file)
+        except BaseException:
+            shutil.rmtree(staging_directory, ignore_errors=True)
+            raise
+
+        # Directories cannot be replaced atomically: move the old store aside, then swap
+        retired_directory = None
+        if os.path.exists(persist_directory):
+            retired_directory = tempfile.mkdtemp(prefix=f".{name}.old.", dir=parent)
+            os.replace(persist_directory, os.path.join(retired_directory, name))
+        os.replace(staging_directory, persist_directory)
+        if retired_directory:
+            # Open memory maps keep the old files alive; on Windows they may block removal
+            shutil.rmtree(retired_directory, ignore_errors=True)
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, persist_directory=None, dtype="float32", **kwargs):
+        texts = list(texts)
+        cls.save(persist_directory, embedding.embed_documents(texts), texts, metadatas, dtype)
+        return cls(persist_directory, embedding)
+
+    @classmethod
+    def from_chroma(cls, chroma, persist_directory, dtype="float32", ids=None):
+        """Export a Chroma store (only ``ids`` when given) without re-embedding its documents."""
+        data = chroma.get(ids=ids, include=["embeddings", "documents", "metadatas"])
+        cls.save(persist_directory, data["embeddings"], data["documents"], data["metadatas"], dtype)
+        return cls(persist_directory, chroma.embeddings)
+
+    def add_texts(self, texts, metadatas=None, **kwargs):
+        raise NotImplementedError("CompactVectorStore is read-only; export the documents again instead")
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def _document(self, index):
+        text = bytes(self.texts[self.text_offsets[index]:self.text_offsets[index + 1]]).decode("utf-8")
+        metadata = bytes(self.metadata[self.metadata_offsets[index]:self.metadata_offsets[index + 1]]).decode("utf-8")
+        return Document(page_content=text, metadata=json.loads(metadata) if metadata else {})
+
+    def search_vectors(self, query_vectors, k=4):
+        """Vectorized exact top-k for one or more query vectors; returns (indices, squared L2 distances)."""
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        k = min(k, len(self))
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty
+        dots = np.empty((len(self), len(queries)), dtype=np.float32)
+        for begin in range(0, len(self), SEARCH_BLOCK_ROWS):
+            block = self.vectors[begin:begin + SEARCH_BLOCK_ROWS]
+            dots[begin:begin + len(block)] = block.astype(np.float32, copy=False) @ queries.T
+        if self.scales is not None:
+            dots *= self.scales[:, None]
+        # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+        distances = (self.sq_norms[:, None] - 2 * dots + np.einsum("ij,ij->i", queries, queries)).T
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.maximum(np.take_along_axis(top_distances, order, axis=1), 0)
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4, **kwargs):
+        indices, distances = self.search_vectors(embedding, k)
+        return [(self._document(int(index)), float(distance))
+                for index, distance in zip(indices[0], distances[0])]
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self.embedding_function.embed_query(query), k
+        )
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_by_vector_with_relevance_scores(embedding, k)]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
@@ -1,5 +1,7 @@
 import os
 import glob
+import uuid
+import argparse
 from langchain_community.document_loaders import PDFPlumberLoader
 from bs4 import BeautifulSoup
 from langchain.schema import Document
@@ -12,6 +14,7 @@ class DocsScraper:
     EXCEL_FILE_PATH = BASE_PATH + "\\data\\generales-banco.xlsx"
     DOCUMENTS_PATH = BASE_PATH + "\\data\\documents\\" 
     VECTOR_STORE_PATH = "./data/vector_store" 
+    COMPACT_STORE_PATH = "./data/compact_store"
 
     def __init__(self):
         self.pdf_content = []
@@ -56,12 +59,30 @@ class DocsScraper:
         return splits
 
     def save_to_vector_store(self, splits):        
+        # Explicit ids so the chunks added by this run can be told apart from earlier runs
+        ids = [str(uuid.uuid4()) for _ in splits]
         vector_store = Chroma.from_documents(
                 documents=splits,
                 embedding=self.embeddings,
-                persist_directory=self.VECTOR_STORE_PATH
+                persist_directory=self.VECTOR_STORE_PATH,
+                ids=ids
             )
         vector_store.persist()
+        return vector_store, ids
+
+    def save_to_compact_store(self, splits, dtype="float32", vector_store=None, ids=None):
+        # Imported here so the Chroma-only path does not need numpy
+        from compact_vector_store import CompactVectorStore
+        if vector_store is not None:
+            # Reuse the embeddings just stored in Chroma instead of embedding again
+            CompactVectorStore.from_chroma(vector_store, self.COMPACT_STORE_PATH, dtype=dtype, ids=ids)
+            return
+        CompactVectorStore.from_documents(
+                documents=splits,
+                embedding=self.embeddings,
+                persist_directory=self.COMPACT_STORE_PATH,
+                dtype=dtype
+            )
 
     def process_documents(self, doc):
         file_extension = os.path.splitext(doc)[1].lower()            
@@ -75,6 +96,12 @@ class DocsScraper:
     
         
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load, split and embed the banking documents.")
+    parser.add_argument("--backend", choices=["chroma", "compact", "both"], default="chroma",
+                        help="Vector store(s) to write")
+    parser.add_argument("--int8", action="store_true", help="Quantize compact store embeddings to int8")
+    args = parser.parse_args()
+
     print("Starting documents process...")
     scraper = DocsScraper()
     # Check if folder exists
@@ -94,9 +121,14 @@ if __name__ == "__main__":
     all_documents = scraper.pdf_content + scraper.html_content
     splits = scraper.split_text(all_documents)
 
-    if(os.path.exists(scraper.VECTOR_STORE_PATH)):    
-        scraper.save_to_vector_store(splits)
-    else:
-        print(f"*** Vector store path not found: {scraper.VECTOR_STORE_PATH} ***")
+    vector_store, ids = None, None
+    if args.backend in ("chroma", "both"):
+        if(os.path.exists(scraper.VECTOR_STORE_PATH)):    
+            vector_store, ids = scraper.save_to_vector_store(splits)
+        else:
+            print(f"*** Vector store path not found: {scraper.VECTOR_STORE_PATH} ***")
+    if args.backend in ("compact", "both"):
+        scraper.save_to_compact_store(splits, dtype="int8" if args.int8 else "float32",
+                                      vector_store=vector_store, ids=ids)
            
     print("All documents processed and saved to vector store.")
\ No newline at end of file
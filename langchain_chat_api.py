@@ -1,16 +1,19 @@
 # langchain_banking_api.py
+import time
+PROCESS_START = time.perf_counter()
+
 import os
+import sys
+import json
+import asyncio
+import threading
 import traceback
 from fastapi import FastAPI, HTTPException, Request
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
-from langchain_community.vectorstores import Chroma
-from langchain_ollama import OllamaEmbeddings
-from langchain_ollama.chat_models import ChatOllama
-from langchain.memory import ConversationBufferMemory
-from langchain.chains import ConversationalRetrievalChain
-from langchain.prompts import PromptTemplate
-import uvicorn
+# LangChain, Chroma and Ollama clients are imported on first use (see get_shared_resources)
 import uuid
 import logging
 
@@ -27,6 +30,47 @@ app = FastAPI(title="LangChain Banking Agent API")
 # Store active conversations
 conversations = {}
 
+# Embeddings, vector store, LLM, prompt and chain templates built once and shared
+# by every session and batch job
+shared_resources = {}
+shared_resources_lock = threading.Lock()
+
+# Seconds spent in each startup phase, reported by /debug/startup
+startup_timings = {}
+
+# Cold-start-to-ready budget and whether to warm up at startup instead of on first use
+STARTUP_TARGET_SECONDS = float(os.getenv("STARTUP_TARGET_SECONDS", "20"))
+EAGER_WARMUP = os.getenv("EAGER_WARMUP", "").lower() in ("1", "true", "yes")
+
+PERSIST_DIRECTORY = "./data/vector_store"
+COMPACT_STORE_DIRECTORY = "./data/compact_store"
+
+# "chroma" (default) or "compact" for the memory-mapped exact search store (see compact_vector_store.py)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+
+# Custom prompt template for the Panamanian Banking Expert
+# --- Historial de conversación: {chat_history}
+QA_PROMPT_TEMPLATE = """Eres un experto en productos y tarifas de servicios bancarios de Panamá.        
+        Debes responder siempre en español. Utiliza la siguiente información de contexto para responder a la pregunta del usuario.        
+        Si no conoces la respuesta, simplemente indica que no tienes esa información, no inventes respuestas. No menciones bancos de otros paises que no sea de Panamá.        
+        Mantén tus respuestas concisas, precisas y profesionales.
+        
+        Contexto: {context}        
+        
+        Pregunta: {question}
+        
+        Respuesta:"""
+
+# Generations running at once across all /batch requests (one local Ollama serves them all)
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+batch_semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+# Questions accepted per /batch request (all are embedded in one call)
+BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "200"))
+
+# Retrieval settings shared by /session and /batch
+RETRIEVER_K = 10
+RETRIEVER_SCORE_THRESHOLD = 0.90
+
 # Define request and response models
 class ChatRequest(BaseModel):
     session_id: str
@@ -44,6 +88,10 @@ class SessionResponse(BaseModel):
     agent_type: str = "langchain"
     agent_name: str = "Experto en Productos Bancarios Panameños"
 
+class BatchRequest(BaseModel):
+    questions: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_QUESTIONS)
+    max_concurrency: int = Field(default=4, ge=1, le=16)
+
 # Middleware to log requests and responses
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -67,54 +115,9 @@ async def create_session(request: SessionRequest):
     session_id = str(uuid.uuid4())
     
     try:
-        logger.info("Initializing embeddings...")
-        # Initialize embeddings
-        embeddings = OllamaEmbeddings(model="nomic-embed-text:latest")
-        
-        logger.info("Checking for vector store directory...")
-        # Check if vector store directory exists
-        persist_directory = "./data/vector_store"
-        if not os.path.exists(persist_directory):
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Vector store directory not found: {persist_directory}"
-            )
-        
-        logger.info("Initializing Chroma vector store...")
-        # Initialize the vector store from the persist directory
-        try:
-            vectorstore = Chroma(persist_directory=persist_directory, embedding_function=embeddings)
-        except Exception as e:
-            logger.error(f"Failed to initialize Chroma: {str(e)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to initialize vector store: {str(e)}"
-            )
-        
-        logger.info("Creating retriever...")
-        # Create a retriever with diverse search results
-        retriever = vectorstore.as_retriever(
-            # *** Standard similarity search for top 3 documents ***
-            #search_type="similarity",            
-            #search_kwargs={"k": 5}  
-            
-            # *** Similarity search with a score threshold ***
-            search_type="similarity_score_threshold",
-            search_kwargs={'k': 10, 'score_threshold': 0.90} 
-        )
-        
-        logger.info("Initializing ChatOllama model...")
-        # Initialize the ChatOllama model
-        try:
-            llm = ChatOllama(model="gemma3:1b",temperature=0)
-        except Exception as e:
-            logger.error(f"Failed to initialize LLM: {str(e)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to initialize LLM. Is Ollama running? Error: {str(e)}"
-            )
+        resources = await run_in_threadpool(get_shared_resources)
+        from langchain.memory import ConversationBufferMemory
+        from langchain.chains import ConversationalRetrievalChain
         
         logger.info("Setting up memory...")
         # Initialize memory
@@ -123,34 +126,14 @@ async def create_session(request: SessionRequest):
             return_messages=True
         )
         
-        logger.info("Creating prompt template...")
-        # Create custom prompt template for the Panamanian Banking Expert
-        # --- Historial de conversación: {chat_history}
-        prompt_template = """Eres un experto en productos y tarifas de servicios bancarios de Panamá.        
-        Debes responder siempre en español. Utiliza la siguiente información de contexto para responder a la pregunta del usuario.        
-        Si no conoces la respuesta, simplemente indica que no tienes esa información, no inventes respuestas. No menciones bancos de otros paises que no sea de Panamá.        
-        Mantén tus respuestas concisas, precisas y profesionales.
-        
-        Contexto: {context}        
-        
-        Pregunta: {question}
-        
-        Respuesta:"""
-        
-        qa_prompt = PromptTemplate(
-            template=prompt_template, 
-            #input_variables=["context", "chat_history", "question"]
-            input_variables=["context", "question"]
-        )
-        
         logger.info("Creating ConversationalRetrievalChain...")
-        # Create the conversational chain with custom prompt
+        # Only the memory is per session; retriever and sub-chains are shared templates
         try:
-            conversation = ConversationalRetrievalChain.from_llm(
-                llm=llm,
-                retriever=retriever,
+            conversation = ConversationalRetrievalChain(
+                retriever=resources["retriever"],
+                combine_docs_chain=resources["combine_docs_chain"],
+                question_generator=resources["question_generator"],
                 memory=memory,
-                combine_docs_chain_kwargs={"prompt": qa_prompt},
                 verbose=True
             )
         except Exception as e:
@@ -161,20 +144,6 @@ async def create_session(request: SessionRequest):
                 detail=f"Failed to create conversation chain: {str(e)}"
             )
         
-        # Test query to verify everything works
-        logger.info("Testing the chain with a simple query...")
-        try:
-            # Simple test query
-            test_result = conversation.invoke({"question": "Hola"})
-            logger.info(f"Test query successful. Response: {test_result['answer'][:50]}...")
-        except Exception as e:
-            logger.error(f"Test query failed: {str(e)}")
-            logger.error(traceback.format_exc())
-            raise HTTPException(
-                status_code=500,
-                detail=f"Test query failed: {str(e)}"
-            )
-        
         # Store the conversation
         conversations[session_id] = {
             "conversation": conversation,
@@ -231,6 +200,203 @@ async def chat(request: ChatRequest):
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=error_message)
 
+def vector_store_directory():
+    return COMPACT_STORE_DIRECTORY if VECTOR_BACKEND == "compact" else PERSIST_DIRECTORY
+
+def record_timing(phase, start):
+    startup_timings[phase] = time.perf_counter() - start
+    logger.info(f"Startup phase '{phase}' took {startup_timings[phase]:.2f}s")
+
+def get_shared_resources():
+    """Build (once) the embeddings, vector store, LLM, prompt and chain templates, then warm up the models."""
+    with shared_resources_lock:
+        if shared_resources:
+            return shared_resources
+        load_start = time.perf_counter()
+        
+        logger.info("Checking for vector store directory...")
+        if VECTOR_BACKEND not in ("chroma", "compact"):
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unknown VECTOR_BACKEND: {VECTOR_BACKEND}"
+            )
+        persist_directory = vector_store_directory()
+        if not os.path.exists(persist_directory):
+            raise HTTPException(
+                status_code=500,
+                detail=f"Vector store directory not found: {persist_directory}"
+            )
+        
+        logger.info("Importing LangChain modules...")
+        start = time.perf_counter()
+        from langchain_community.vectorstores import Chroma
+        from langchain_ollama import OllamaEmbeddings
+        from langchain_ollama.chat_models import ChatOllama
+        # Used by create_session; preloaded here so their cost lands in "langchain_import"
+        from langchain.memory import ConversationBufferMemory
+        from langchain.chains import ConversationalRetrievalChain
+        from langchain.chains.llm import LLMChain
+        from langchain.chains.question_answering import load_qa_chain
+        from langchain.chains.conversational_retrieval.prompts import CONDENSE_QUESTION_PROMPT
+        from langchain.prompts import PromptTemplate
+        record_timing("langchain_import", start)
+        
+        logger.info(f"Initializing {VECTOR_BACKEND} vector store...")
+        start = time.perf_counter()
+        embeddings = OllamaEmbeddings(model="nomic-embed-text:latest")
+        try:
+            if VECTOR_BACKEND == "compact":
+                from compact_vector_store import CompactVectorStore
+                vectorstore = CompactVectorStore(persist_directory, embeddings)
+            else:
+                vectorstore = Chroma(persist_directory=persist_directory, embedding_function=embeddings)
+        except Exception as e:
+            logger.error(f"Failed to initialize {VECTOR_BACKEND} vector store: {str(e)}")
+            logger.error(traceback.format_exc())
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to initialize vector store: {str(e)}"
+            )
+        record_timing("vector_store_open", start)
+        
+        logger.info("Initializing ChatOllama model...")
+        try:
+            llm = ChatOllama(model="gemma3:1b", temperature=0)
+        except Exception as e:
+            logger.error(f"Failed to initialize LLM: {str(e)}")
+            logger.error(traceback.format_exc())
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to initialize LLM. Is Ollama running? Error: {str(e)}"
+            )
+        
+        logger.info("Creating prompt and chain templates...")
+        qa_prompt = PromptTemplate(
+            template=QA_PROMPT_TEMPLATE, 
+            #input_variables=["context", "chat_history", "question"]
+            input_variables=["context", "question"]
+        )
+        # Create a retriever with diverse search results
+        retriever = vectorstore.as_retriever(
+            # *** Standard similarity search for top 3 documents ***
+            #search_type="similarity",            
+            #search_kwargs={"k": 5}  
+            
+            # *** Similarity search with a score threshold ***
+            search_type="similarity_score_threshold",
+            search_kwargs={'k': RETRIEVER_K, 'score_threshold': RETRIEVER_SCORE_THRESHOLD} 
+        )
+        # Same sub-chains ConversationalRetrievalChain.from_llm would build; they hold no session state
+        combine_docs_chain = load_qa_chain(llm, chain_type="stuff", verbose=True, prompt=qa_prompt)
+        question_generator = LLMChain(llm=llm, prompt=CONDENSE_QUESTION_PROMPT, verbose=True)
+        
+        # Test query to verify everything works and load both models into Ollama
+        logger.info("Warming up models with a simple query...")
+        start = time.perf_counter()
+        try:
+            embeddings.embed_query("Hola")
+            test_result = llm.invoke(qa_prompt.format(context="", question="Hola"))
+            logger.info(f"Test query successful. Response: {test_result.content[:50]}...")
+        except Exception as e:
+            logger.error(f"Test query failed: {str(e)}")
+            logger.error(traceback.format_exc())
+            raise HTTPException(
+                status_code=500,
+                detail=f"Test query failed: {str(e)}"
+            )
+        record_timing("model_warm_up", start)
+        record_timing("shared_resources_load", load_start)
+        # Cold start excludes any idle time between boot and the first request in lazy mode
+        startup_timings["ready"] = startup_timings["module_import"] + startup_timings["shared_resources_load"]
+        
+        shared_resources.update({
+            "embeddings": embeddings,
+            "vectorstore": vectorstore,
+            "llm": llm,
+            "qa_prompt": qa_prompt,
+            "retriever": retriever,
+            "combine_docs_chain": combine_docs_chain,
+            "question_generator": question_generator
+        })
+        return shared_resources
+
+def retrieve_contexts(resources, questions):
+    """Embed all questions in one call and run the score-threshold search for each vector."""
+    vectorstore = resources["vectorstore"]
+    vectors = resources["embeddings"].embed_documents(questions)
+    # Same normalisation the "similarity_score_threshold" retriever applies
+    relevance_fn = vectorstore._select_relevance_score_fn()
+    contexts = {}
+    for question, vector in zip(questions, vectors):
+        results = vectorstore.similarity_search_by_vector_with_relevance_scores(
+            embedding=vector, k=RETRIEVER_K
+        )
+        contexts[question] = [
+            doc for doc, score in results
+            if relevance_fn(score) >= RETRIEVER_SCORE_THRESHOLD
+        ]
+    return contexts
+
+async def generate_answer(resources, semaphore, question, docs):
+    # Per-request limit first, then the process-wide one
+    async with semaphore, batch_semaphore:
+        try:
+            prompt = resources["qa_prompt"].format(
+                context="\n\n".join(doc.page_content for doc in docs),
+                question=question
+            )
+            result = await resources["llm"].ainvoke(prompt)
+            return question, {"answer": result.content}
+        except Exception as e:
+            logger.error(f"Batch question failed: {question}: {str(e)}")
+            logger.error(traceback.format_exc())
+            return question, {"error": str(e)}
+
+# Answer many questions in one job, streaming NDJSON results as they complete
+@app.post("/batch")
+async def batch(request: BatchRequest):
+    # Map each distinct question to the positions it was asked at
+    positions = {}
+    for index, question in enumerate(request.questions):
+        question = question.strip()
+        if question:
+            positions.setdefault(question, []).append(index)
+    if not positions:
+        raise HTTPException(status_code=400, detail="No questions provided")
+
+    logger.info(f"Batch of {len(request.questions)} questions ({len(positions)} unique)")
+
+    try:
+        resources = await run_in_threadpool(get_shared_resources)
+        contexts = await run_in_threadpool(retrieve_contexts, resources, list(positions))
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_message = f"Error retrieving batch context: {str(e)}"
+        logger.error(error_message)
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=error_message)
+
+    async def stream_results():
+        semaphore = asyncio.Semaphore(request.max_concurrency)
+        tasks = [
+            asyncio.create_task(generate_answer(resources, semaphore, question, docs))
+            for question, docs in contexts.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                question, result = await next_done
+                sources = sorted({doc.metadata.get("source", "") for doc in contexts[question]} - {""})
+                for index in positions[question]:
+                    line = {"index": index, "question": question, "sources": sources, **result}
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+        finally:
+            # Client disconnected or stream closed: stop pending generations
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 # Get agent information
 @app.get("/info")
 async def get_info():
@@ -240,26 +406,54 @@ async def get_info():
         "description": "Un experto en productos bancarios panameños y tarifas de servicios bancarios que responde en español."
     }
 
+# Optionally pay the cold start before serving traffic instead of on the first request
+@app.on_event("startup")
+async def warm_up():
+    if EAGER_WARMUP:
+        try:
+            await run_in_threadpool(get_shared_resources)
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.error(f"Startup warm-up failed: {detail}")
+
+# Startup-time breakdown
+@app.get("/debug/startup")
+async def debug_startup():
+    ready = startup_timings.get("ready")
+    return {
+        "ready": ready is not None,
+        "timings_seconds": {phase: round(seconds, 3) for phase, seconds in startup_timings.items()},
+        "target_seconds": STARTUP_TARGET_SECONDS,
+        "within_target": ready is not None and ready <= STARTUP_TARGET_SECONDS,
+        "uptime_seconds": round(time.perf_counter() - PROCESS_START, 3),
+        "eager_warmup": EAGER_WARMUP,
+        "langchain_loaded": "langchain" in sys.modules
+    }
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     try:
         # Check if Ollama is available
         try:
-            embeddings = OllamaEmbeddings(model="nomic-embed-text:latest")
+            embeddings = shared_resources.get("embeddings")
+            if embeddings is None:
+                from langchain_ollama import OllamaEmbeddings
+                embeddings = OllamaEmbeddings(model="nomic-embed-text:latest")
             embed_test = embeddings.embed_query("test")
             ollama_status = "ok" if len(embed_test) > 0 else "error"
         except Exception as e:
             ollama_status = f"error: {str(e)}"
         
         # Check if vector store exists
-        persist_directory = "./data/vector_store"
+        persist_directory = vector_store_directory()
         vector_store_exists = os.path.exists(persist_directory)
         
         return {
             "status": "up",
             "ollama": ollama_status,
             "vector_store": "exists" if vector_store_exists else "missing",
+            "vector_backend": VECTOR_BACKEND,
             "active_sessions": len(conversations)
         }
     except Exception as e:
@@ -269,5 +463,8 @@ async def health_check():
             "error": str(e)
         }
 
+startup_timings["module_import"] = time.perf_counter() - PROCESS_START
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file